@@ -39,10 +39,12 @@ class CaseOfTheMondaysAlgorithm(QCAlgorithm):
         )
 
     def _enter(self):
+        # Price the stop off the same tick the entry is submitted against.
+        price = self._security.price
         quantity = self.calculate_order_quantity(self._symbol, 1)
         self.market_order(self._symbol, quantity)
         self.stop_market_order(
             self._symbol, -quantity, 
-            round(self._security.price * self._stop_loss_percent, 2)
+            round(price * self._stop_loss_percent, 2)
         )
 
@@ -2,10 +2,109 @@
 from AlgorithmImports import *
 import numpy as np
 import pandas as pd
+import re
 from datetime import datetime, timedelta
+from itertools import chain
+from numba import njit
 #endregion
 
 
+# Lead underwriters treated as bulge bracket (matched as lowercase substrings)
+BULGE_BRACKET = ('goldman', 'morgan stanley', 'jpmorgan', 'jp morgan',
+                 'bank of america', 'citigroup', 'barclays', 'credit suisse')
+
+# Raw numeric inputs read from `ipo_data`, in the order the feature kernel
+# expects them: (section, key, default). The underwriter tier is derived
+# from a string, so it is appended after these as the last raw input.
+_RAW_INPUTS = (
+    ('fundamentals', 'revenue', 0),
+    ('fundamentals', 'revenue_growth_yoy', 0),
+    ('fundamentals', 'gross_margin', 0),
+    ('fundamentals', 'operating_margin', 0),
+    ('fundamentals', 'net_income', 0),
+    ('fundamentals', 'cash', 0),
+    ('fundamentals', 'debt_to_equity', 0),
+    ('fundamentals', 'top5_customer_pct', 0),
+    ('fundamentals', 'employees', 0),
+    ('fundamentals', 'founded_year', 2020),
+    ('deal', 'offer_price', 20),
+    ('deal', 'range_low', 18),
+    ('deal', 'range_high', 22),
+    ('deal', 'shares_offered', 10e6),
+    ('deal', 'shares_outstanding', 100e6),
+    ('fundamentals', 'revenue', 1),  # Revenue for price-to-sales
+    ('deal', 'lockup_period', 180),
+    ('deal', 'greenshoe_pct', 15),
+    ('deal', 'proceeds_for_growth', 0.5),
+    ('market', 'vix', 15),
+    ('market', 'spy_return_30d', 0),
+    ('market', 'sector_return_30d', 0),
+    ('market', 'recent_ipo_avg_return', 0),
+    ('market', 'ipos_same_week', 1),
+    ('sentiment', 'finbert_score', 0),
+    ('sentiment', 'news_count', 0),
+    ('sentiment', 'sentiment_trend', 0),
+    ('sentiment', 'social_buzz', 0),
+    ('sentiment', 'google_trends', 0),
+)
+_N_RAW_INPUTS = len(_RAW_INPUTS) + 1
+
+
+@njit(cache=True, fastmath=True)
+def _assemble_features(raw, out, current_year):
+    """
+    Turn the flat array of raw IPO inputs into the 28 model features.
+
+    Args:
+        raw: float64 array laid out as `_RAW_INPUTS` + underwriter tier
+        out: (1, 28) array the features are written into
+        current_year: Year used to compute the company age
+    """
+    f = out[0]
+
+    # 1. Fundamental Features (10)
+    f[0] = raw[0] / 1e6                                 # Revenue (millions)
+    f[1] = raw[1] * 100                                 # Revenue growth YoY (%)
+    f[2] = raw[2] * 100                                 # Gross margin (%)
+    f[3] = raw[3] * 100                                 # Operating margin (%)
+    f[4] = 1.0 if raw[4] > 0 else 0.0                   # Profitability
+    f[5] = raw[5] / 1e6                                 # Cash position (millions)
+    f[6] = raw[6]                                       # Debt-to-equity ratio
+    f[7] = raw[7] * 100                                 # Top 5 customer concentration (%)
+    f[8] = raw[8]                                       # Employee count
+    f[9] = current_year - raw[9]                        # Company age (years)
+
+    # 2. Deal Characteristics (8)
+    offer_price = raw[10]
+    range_midpoint = (raw[11] + raw[12]) / 2
+    price_vs_range = ((offer_price - range_midpoint) / range_midpoint) * 100
+    shares_outstanding = raw[14]
+    revenue = raw[15]
+
+    f[10] = price_vs_range                              # Offer price vs. range midpoint (%)
+    f[11] = raw[13] / shares_outstanding * 100          # Float (%)
+    f[12] = offer_price * shares_outstanding / revenue if revenue > 0 else 0.0  # Price-to-sales
+    f[13] = raw[29]                                     # Underwriter tier
+    f[14] = raw[16]                                     # Lock-up period (days)
+    f[15] = raw[17]                                     # Greenshoe option size (%)
+    f[16] = raw[18]                                     # Use of proceeds (0-1 scale)
+    f[17] = max(0.0, price_vs_range / 10)               # Subscription level (normalized)
+
+    # 3. Market Conditions (5)
+    f[18] = raw[19]                                     # VIX level on pricing date
+    f[19] = raw[20] * 100                               # S&P 500 30-day return (%)
+    f[20] = raw[21] * 100                               # Sector ETF 30-day return (%)
+    f[21] = raw[22] * 100                               # IPO market temperature (%)
+    f[22] = raw[23]                                     # IPOs in same week
+
+    # 4. Sentiment Features (5)
+    f[23] = raw[24]                                     # FinBERT score (-1 to +1)
+    f[24] = raw[25]                                     # News volume (past 30 days)
+    f[25] = raw[26]                                     # Sentiment velocity
+    f[26] = raw[27]                                     # Social media buzz (0-100)
+    f[27] = raw[28]                                     # Google Trends score (0-100)
+
+
 class IPOFeatureExtractor:
     """
     Extracts features from S-1 filings and market data for IPO scoring.
@@ -19,6 +118,8 @@ class IPOFeatureExtractor:
     For now, this shows the feature engineering logic.
     """
 
+    N_FEATURES = 28
+
     def __init__(self, qb=None):
         """
         Initialize with QuantBook for historical data access.
@@ -28,188 +129,71 @@ class IPOFeatureExtractor:
         """
         self.qb = qb
 
+        # Reused (1, 28) buffer that `extract_all_features` fills in place,
+        # so scoring doesn't allocate a new array for every IPO.
+        self._feat_buf = np.empty((1, self.N_FEATURES), dtype=np.float32)
+
+        # One alternation pattern instead of a substring scan per bank
+        self._bulge_re = re.compile('|'.join(map(re.escape, BULGE_BRACKET)))
+
+        # Compile the feature kernel now rather than on the first IPO
+        self.extract_all_features({})
+
     def extract_all_features(self, ipo_data):
         """
         Extract all 28 features for model scoring.
 
+        The raw inputs are flattened in one pass and the arithmetic runs in
+        the compiled `_assemble_features` kernel. Features are written in
+        place into a single preallocated float32 buffer in the order given
+        by `get_feature_names`. The buffer is overwritten on the next call,
+        so copy it if you need to keep it.
+
         Args:
             ipo_data: Dictionary with IPO information from S-1 and market data
 
         Returns:
-            List of 28 feature values
-        """
-        features = []
-
-        # 1. Fundamental Features (10)
-        features.extend(self._extract_fundamental_features(ipo_data))
-
-        # 2. Deal Characteristics (8)
-        features.extend(self._extract_deal_features(ipo_data))
-
-        # 3. Market Conditions (5)
-        features.extend(self._extract_market_features(ipo_data))
-
-        # 4. Sentiment Features (5)
-        features.extend(self._extract_sentiment_features(ipo_data))
-
-        return features
-
-    def _extract_fundamental_features(self, ipo_data):
-        """
-        Extract fundamental metrics from S-1 filing.
-
-        Example S-1 sections to parse:
-        - Summary Financial Data table
-        - Management's Discussion & Analysis (MD&A)
-        - Balance Sheet
-        - Income Statement
+            NumPy array of shape (1, 28) with the feature values
         """
-        fundamentals = ipo_data.get('fundamentals', {})
-
-        # Revenue (most recent fiscal year, in millions)
-        revenue = fundamentals.get('revenue', 0) / 1e6
-
-        # Revenue growth YoY (%)
-        revenue_growth = fundamentals.get('revenue_growth_yoy', 0) * 100
-
-        # Gross margin (%)
-        gross_margin = fundamentals.get('gross_margin', 0) * 100
-
-        # Operating margin (%)
-        operating_margin = fundamentals.get('operating_margin', 0) * 100
-
-        # Profitability (1 if profitable, 0 if not)
-        is_profitable = 1 if fundamentals.get('net_income', 0) > 0 else 0
-
-        # Cash position (in millions)
-        cash = fundamentals.get('cash', 0) / 1e6
-
-        # Debt-to-equity ratio
-        debt_to_equity = fundamentals.get('debt_to_equity', 0)
-
-        # Customer concentration (% revenue from top 5 customers)
-        customer_concentration = fundamentals.get('top5_customer_pct', 0) * 100
-
-        # Employee count
-        employees = fundamentals.get('employees', 0)
-
-        # Company age (years since founding)
-        founded_year = fundamentals.get('founded_year', 2020)
-        company_age = datetime.now().year - founded_year
-
-        return [
-            revenue, revenue_growth, gross_margin, operating_margin,
-            is_profitable, cash, debt_to_equity, customer_concentration,
-            employees, company_age
-        ]
-
-    def _extract_deal_features(self, ipo_data):
-        """
-        Extract IPO deal characteristics.
-
-        Sources:
-        - Pricing announcement (usually 1 day before listing)
-        - IPO prospectus final amendment
-        - Underwriter syndicate info
-        """
-        deal = ipo_data.get('deal', {})
-
-        # Offer price vs. expected range midpoint (%)
-        offer_price = deal.get('offer_price', 20)
-        range_low = deal.get('range_low', 18)
-        range_high = deal.get('range_high', 22)
-        range_midpoint = (range_low + range_high) / 2
-        price_vs_range = ((offer_price - range_midpoint) / range_midpoint) * 100
-
-        # Float percentage (shares offered / total shares outstanding)
-        shares_offered = deal.get('shares_offered', 10e6)
-        shares_outstanding = deal.get('shares_outstanding', 100e6)
-        float_pct = (shares_offered / shares_outstanding) * 100
-
-        # Price-to-sales ratio (valuation / revenue)
-        market_cap = offer_price * shares_outstanding
-        revenue = ipo_data.get('fundamentals', {}).get('revenue', 1)
-        price_to_sales = market_cap / revenue if revenue > 0 else 0
+        sections = {
+            'fundamentals': ipo_data.get('fundamentals', {}),
+            'deal': ipo_data.get('deal', {}),
+            'market': ipo_data.get('market', {}),
+            'sentiment': ipo_data.get('sentiment', {}),
+        }
 
         # Underwriter tier (1 = bulge bracket, 0 = others)
         # Bulge bracket: Goldman Sachs, Morgan Stanley, JP Morgan, etc.
-        lead_underwriter = deal.get('lead_underwriter', '').lower()
-        bulge_bracket = ['goldman', 'morgan stanley', 'jpmorgan', 'jp morgan',
-                        'bank of america', 'citigroup', 'barclays', 'credit suisse']
-        is_bulge_bracket = any(uw in lead_underwriter for uw in bulge_bracket)
-        underwriter_tier = 1 if is_bulge_bracket else 0
+        lead_underwriter = sections['deal'].get('lead_underwriter', '').lower()
+        underwriter_tier = 1 if self._bulge_re.search(lead_underwriter) else 0
 
-        # Lock-up period (days, typically 180)
-        lockup_days = deal.get('lockup_period', 180)
+        raw = np.fromiter(
+            chain(
+                (sections[section].get(key, default) for section, key, default in _RAW_INPUTS),
+                (underwriter_tier,)
+            ),
+            dtype=np.float64,
+            count=_N_RAW_INPUTS
+        )
 
-        # Greenshoe option size (% of offering, typically 15%)
-        greenshoe_pct = deal.get('greenshoe_pct', 15)
+        _assemble_features(raw, self._feat_buf, datetime.now().year)
+        return self._feat_buf
 
-        # Use of proceeds (1 = growth, 0 = selling shareholders)
-        # Parse S-1 "Use of Proceeds" section
-        use_for_growth = deal.get('proceeds_for_growth', 0.5)  # 0-1 scale
-
-        # Over/under subscription (estimate from pricing vs range)
-        # Strong pricing = oversubscribed
-        subscription_level = max(0, price_vs_range / 10)  # Normalize
+    def _extract_fundamental_features(self, ipo_data):
+        """Return the 10 fundamental features (S-1 financials) as a list."""
+        return self.extract_all_features(ipo_data)[0, :10].tolist()
 
-        return [
-            price_vs_range, float_pct, price_to_sales, underwriter_tier,
-            lockup_days, greenshoe_pct, use_for_growth, subscription_level
-        ]
+    def _extract_deal_features(self, ipo_data):
+        """Return the 8 IPO deal characteristics as a list."""
+        return self.extract_all_features(ipo_data)[0, 10:18].tolist()
 
     def _extract_market_features(self, ipo_data):
-        """
-        Extract market condition features at time of IPO.
-
-        Can be calculated in real-time using QuantConnect data.
-        """
-        market = ipo_data.get('market', {})
-
-        # VIX level on pricing date
-        vix = market.get('vix', 15)
-
-        # S&P 500 return over prior 30 days (%)
-        spy_return_30d = market.get('spy_return_30d', 0) * 100
-
-        # Sector ETF return over prior 30 days (%)
-        sector_return_30d = market.get('sector_return_30d', 0) * 100
-
-        # IPO market temperature (avg return of recent IPOs)
-        # Track all IPOs from past 30 days, calculate avg first-day return
-        ipo_market_temp = market.get('recent_ipo_avg_return', 0) * 100
-
-        # Number of IPOs in same week (supply saturation)
-        ipos_same_week = market.get('ipos_same_week', 1)
-
-        return [vix, spy_return_30d, sector_return_30d, ipo_market_temp, ipos_same_week]
+        """Return the 5 market condition features as a list."""
+        return self.extract_all_features(ipo_data)[0, 18:23].tolist()
 
     def _extract_sentiment_features(self, ipo_data):
-        """
-        Extract sentiment features from news and social media.
-
-        Uses FinBERT for news sentiment (similar to Example 19).
-        """
-        sentiment = ipo_data.get('sentiment', {})
-
-        # FinBERT sentiment score (-1 to +1, aggregate of pre-IPO news)
-        finbert_score = sentiment.get('finbert_score', 0)
-
-        # News volume (number of articles in past 30 days)
-        news_volume = sentiment.get('news_count', 0)
-
-        # Sentiment velocity (change in sentiment over time)
-        # Positive = improving sentiment
-        sentiment_velocity = sentiment.get('sentiment_trend', 0)
-
-        # Social media buzz (normalized score, 0-100)
-        # From Twitter, Reddit, StockTwits mentions
-        social_buzz = sentiment.get('social_buzz', 0)
-
-        # Google Trends score (0-100)
-        google_trends = sentiment.get('google_trends', 0)
-
-        return [finbert_score, news_volume, sentiment_velocity, social_buzz, google_trends]
+        """Return the 5 news and social media sentiment features as a list."""
+        return self.extract_all_features(ipo_data)[0, 23:].tolist()
 
     def get_feature_names(self):
         """Return list of all feature names for model training."""
@@ -242,20 +226,28 @@ class IPOFeatureExtractor:
         Returns:
             Dictionary with market features
         """
-        # Get VIX
         vix_symbol = algorithm.add_index("VIX", Resolution.DAILY).symbol
-        vix_history = algorithm.history(vix_symbol, 1, Resolution.DAILY)
-        vix = vix_history['close'].iloc[-1] if not vix_history.empty else 15
+        spy_symbol = algorithm.add_equity("SPY", Resolution.DAILY).symbol
+        sector_symbol = algorithm.add_equity(sector_etf, Resolution.DAILY).symbol
+
+        # Fetch all three in a single history request
+        history = algorithm.history([vix_symbol, spy_symbol, sector_symbol], 30, Resolution.DAILY)
+        symbols_with_data = history.index.get_level_values(0) if not history.empty else []
+
+        def closes(symbol):
+            return history.loc[symbol]['close'] if symbol in symbols_with_data else None
+
+        # Get VIX
+        vix_closes = closes(vix_symbol)
+        vix = vix_closes.iloc[-1] if vix_closes is not None else 15
 
         # Get SPY return (30 days)
-        spy_symbol = algorithm.add_equity("SPY", Resolution.DAILY).symbol
-        spy_history = algorithm.history(spy_symbol, 30, Resolution.DAILY)
-        spy_return_30d = (spy_history['close'].iloc[-1] / spy_history['close'].iloc[0] - 1)
+        spy_closes = closes(spy_symbol)
+        spy_return_30d = (spy_closes.iloc[-1] / spy_closes.iloc[0] - 1) if spy_closes is not None else 0
 
         # Get sector ETF return (30 days)
-        sector_symbol = algorithm.add_equity(sector_etf, Resolution.DAILY).symbol
-        sector_history = algorithm.history(sector_symbol, 30, Resolution.DAILY)
-        sector_return_30d = (sector_history['close'].iloc[-1] / sector_history['close'].iloc[0] - 1)
+        sector_closes = closes(sector_symbol)
+        sector_return_30d = (sector_closes.iloc[-1] / sector_closes.iloc[0] - 1) if sector_closes is not None else 0
 
         # IPO market temperature - would need to track recent IPOs
         # For simplicity, use SPY performance as proxy
@@ -286,15 +278,24 @@ class IPOScorer:
             model_path: Path to serialized model (pickle file)
         """
         self.model = None
+        self._has_model = False
         self.feature_extractor = IPOFeatureExtractor()
 
         if model_path:
             self.load_model(model_path)
 
     def load_model(self, path):
-        """Load trained model from file."""
+        """
+        Load trained model from file.
+
+        The model's NumPy arrays are memory-mapped read-only rather than
+        copied into memory, so parallel backtests share the OS page cache.
+        This needs an uncompressed `joblib.dump`; compressed files are
+        loaded normally.
+        """
         import joblib
-        self.model = joblib.load(path)
+        self.model = joblib.load(path, mmap_mode='r')
+        self._has_model = self.model is not None
 
     def score_ipo(self, ipo_data):
         """
@@ -306,15 +307,15 @@ class IPOScorer:
         Returns:
             Score between 0 and 1 (probability of success)
         """
-        if not self.model:
+        if not self._has_model:
             # If no model, return neutral score
             return 0.50
 
-        # Extract features
+        # Extract features into the extractor's preallocated (1, 28) float32
+        # buffer. It is C-contiguous, so predict_proba can use it without a copy.
         features = self.feature_extractor.extract_all_features(ipo_data)
 
         # Predict probability
-        features_array = np.array(features).reshape(1, -1)
-        probability = self.model.predict_proba(features_array)[0][1]
+        probability = self.model.predict_proba(features)[0, 1]
 
-        return probability
+        return float(probability)
@@ -1,8 +1,21 @@
 #region imports
 from AlgorithmImports import *
+from functools import lru_cache
 #endregion
 
 
+@lru_cache(maxsize=4096)
+def _parse_ymd(s):
+    """Parse a YYYY-MM-DD string without going through strptime."""
+    return datetime(int(s[:4]), int(s[5:7]), int(s[8:10]))
+
+
+@lru_cache(maxsize=8)
+def _format_ymd(date):
+    """Format a date as YYYY-MM-DD, once per backtest day."""
+    return date.strftime("%Y-%m-%d")
+
+
 class IPOCalendar(PythonData):
     """
     Custom data class for IPO calendar and pre-computed scores.
@@ -38,8 +51,8 @@ class IPOCalendar(PythonData):
         """
         Parse each line of the CSV file.
         """
-        if not (line.strip() and line[0].isdigit()):
-            # Skip header and empty lines
+        if line[:10] != _format_ymd(date):
+            # Skip header, empty lines and IPOs not listing today
             return None
 
         ipo = IPOCalendar()
@@ -49,11 +62,7 @@ class IPOCalendar(PythonData):
             data = line.split(',')
 
             # Parse the date
-            ipo.time = datetime.strptime(data[0], "%Y-%m-%d")
-
-            # Only process if this IPO is listing today
-            if ipo.time.date() != date.date():
-                return None
+            ipo.time = _parse_ymd(data[0])
 
             # Parse IPO data
             ipo.ticker = data[1]
@@ -109,14 +118,10 @@ class IPOData:
             Position size as decimal (0.0-0.15)
         """
         # Scale by confidence
-        confidence_factor = (self.score - 0.70) / 0.30  # 0.70-1.00 → 0-1
-
-        # Reduce if VIX is high
-        vix_factor = 1.0
-        if vix_level > 20:
-            vix_factor = 0.75
-        if vix_level > 30:
-            vix_factor = 0.50
+        confidence_factor = max(0.0, min(1.0, (self.score - 0.70) / 0.30))  # 0.70-1.00 → 0-1
+
+        # Reduce if VIX is high (1.0, 0.75 above 20, 0.50 above 30)
+        vix_factor = 1.0 - 0.25 * (vix_level > 20) - 0.25 * (vix_level > 30)
 
         size = base_size * (0.5 + 0.5 * confidence_factor) * vix_factor
         return min(size, base_size)  # Cap at base size
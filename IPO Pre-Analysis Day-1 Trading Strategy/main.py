@@ -2,6 +2,7 @@
 from AlgorithmImports import *
 from ipocalendar import IPOCalendar, IPOData
 from datetime import timedelta
+from collections import defaultdict
 import json
 #endregion
 
@@ -44,9 +45,16 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
         # Track IPO positions
         self._ipo_positions = {}  # symbol -> IPOData
         self._pending_exits = {}  # symbol -> exit_date
+        self._ipo_cost_basis = {}  # symbol -> filled entry cost of the open position
+        self._ipo_cost_total = 0.0  # sum of _ipo_cost_basis values
+
+        # Chart updates are batched and flushed once per day
+        self._plot_dirty = False
+        self._pending_score_plots = []  # (ticker, score) of today's entries
 
         # Add VIX for market condition monitoring
         self._vix = self.add_index("VIX", Resolution.DAILY).symbol
+        self._vix_cache = {}  # date -> VIX close (a few recent days only)
 
         # Add SPY for market benchmark
         self._spy = self.add_equity("SPY", Resolution.DAILY).symbol
@@ -64,6 +72,12 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
             self._manage_positions
         )
 
+        self.schedule.on(
+            self.date_rules.every_day("SPY"),
+            self.time_rules.before_market_close("SPY", 1),
+            self._flush_plots
+        )
+
         # Load pre-computed IPO scores from Object Store
         self._load_ipo_calendar()
 
@@ -74,7 +88,8 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
 
     def _load_ipo_calendar(self):
         """Load upcoming IPO calendar with pre-computed scores."""
-        self._ipo_calendar = {}
+        self._ipo_calendar = {}  # ticker -> IPOData
+        self._ipos_by_date = defaultdict(list)  # listing date -> [IPOData, ...]
 
         if self.live_mode and self.object_store.contains_key("ipo_calendar"):
             # Load from Object Store in live trading
@@ -83,36 +98,59 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
             # Parse CSV
             import pandas as pd
             from io import StringIO
-            df = pd.read_csv(StringIO(calendar_csv))
+            df = pd.read_csv(
+                StringIO(calendar_csv),
+                parse_dates=['date'],
+                dtype={'score': 'float64', 'offer_price': 'float64', 'shares_offered': 'int64'}
+            )
+            columns = ['date', 'ticker', 'company_name', 'score', 'offer_price', 'shares_offered', 'sector']
 
-            for _, row in df.iterrows():
-                ticker = row['ticker']
-                self._ipo_calendar[ticker] = IPOData(
+            for date, ticker, company_name, score, offer_price, shares_offered, sector in \
+                    df[columns].itertuples(index=False, name=None):
+                self._add_to_calendar(IPOData(
                     ticker=ticker,
-                    listing_date=datetime.strptime(row['date'], '%Y-%m-%d'),
-                    score=row['score'],
-                    offer_price=row['offer_price'],
-                    sector=row['sector'],
-                    shares_offered=row['shares_offered'],
-                    company_name=row['company_name']
-                )
+                    listing_date=date.to_pydatetime(),
+                    score=float(score),
+                    offer_price=float(offer_price),
+                    sector=sector,
+                    shares_offered=int(shares_offered),
+                    company_name=company_name
+                ))
 
             self.log(f"Loaded {len(self._ipo_calendar)} upcoming IPOs from calendar")
         else:
             # In backtest mode, would need historical IPO data
             # For now, using manual entry
-            self.log("No IPO calendar found. Add IPOs manually via _ipo_calendar")
+            self.log("No IPO calendar found. Add IPOs manually via _add_to_calendar")
+
+    def _add_to_calendar(self, ipo_data):
+        """
+        Add an IPO to the calendar, indexed by ticker and by listing date.
+
+        Args:
+            ipo_data: IPOData object
+        """
+        self._ipo_calendar[ipo_data.ticker] = ipo_data
+        self._ipos_by_date[ipo_data.listing_date.date()].append(ipo_data)
 
     def _check_for_new_ipos(self):
         """
         Check if any IPOs from the calendar are listing today.
         Execute trades for high-confidence opportunities.
         """
-        # Check each ticker in the calendar
-        for ticker, ipo_data in list(self._ipo_calendar.items()):
-            # Is this IPO listing today?
-            if ipo_data.listing_date.date() != self.time.date():
-                continue
+        # Only look at the IPOs listing today
+        ipos_today = self._ipos_by_date.get(self.time.date())
+        if not ipos_today:
+            return
+
+        # Nothing to do if the position or exposure caps are already hit
+        capacity_reached = self._ipo_capacity_reached()
+        if capacity_reached:
+            self.log(f"{capacity_reached}. Skipping {len(ipos_today)} IPO(s) listing today")
+            return
+
+        for ipo_data in ipos_today:
+            ticker = ipo_data.ticker
 
             # Already have a position?
             if ticker in self._ipo_positions:
@@ -123,22 +161,6 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
                 self.log(f"IPO {ticker} score {ipo_data.score:.2f} below threshold {self._score_threshold}")
                 continue
 
-            # Check position limits
-            if len(self._ipo_positions) >= self._max_positions:
-                self.log(f"Max positions ({self._max_positions}) reached. Skipping {ticker}")
-                continue
-
-            # Check if we have room for more IPO exposure
-            current_ipo_exposure = sum(
-                self.portfolio[symbol].holdings_value / self.portfolio.total_portfolio_value
-                for symbol in self._ipo_positions.keys()
-                if self.portfolio[symbol].invested
-            )
-
-            if current_ipo_exposure >= self._max_ipo_exposure:
-                self.log(f"Max IPO exposure ({self._max_ipo_exposure:.0%}) reached. Skipping {ticker}")
-                continue
-
             # Try to add the security
             try:
                 symbol = self.add_equity(ticker, Resolution.MINUTE).symbol
@@ -158,6 +180,29 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
             # Execute trade
             self._enter_ipo_position(symbol, ipo_data, position_size)
 
+            # The caps only change after an entry, so re-check them here
+            capacity_reached = self._ipo_capacity_reached()
+            if capacity_reached:
+                self.log(f"{capacity_reached}. Skipping remaining IPOs today")
+                break
+
+    def _ipo_capacity_reached(self):
+        """
+        Check the position count and total IPO exposure limits.
+
+        Returns:
+            Reason string if a limit is reached, otherwise None
+        """
+        if len(self._ipo_positions) >= self._max_positions:
+            return f"Max positions ({self._max_positions}) reached"
+
+        # Exposure is measured at filled entry cost (see on_order_event)
+        current_ipo_exposure = self._ipo_cost_total / self.portfolio.total_portfolio_value
+        if current_ipo_exposure >= self._max_ipo_exposure:
+            return f"Max IPO exposure ({self._max_ipo_exposure:.0%}) reached"
+
+        return None
+
     def _enter_ipo_position(self, symbol, ipo_data, position_size):
         """
         Enter a new IPO position.
@@ -184,15 +229,16 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
             self.log(f"Calculated quantity is 0 for {symbol}. Skipping.")
             return
 
-        # Place limit order
-        ticket = self.limit_order(symbol, quantity, limit_price)
-
-        # Store position data
+        # Store position data before ordering: the limit is marketable, and
+        # on_order_event only books fills for symbols in _ipo_positions
         ipo_data.entry_price = limit_price
         ipo_data.entry_time = self.time
         ipo_data.exit_target_date = self.time + timedelta(days=self._holding_period_days)
         self._ipo_positions[symbol] = ipo_data
 
+        # Place limit order
+        ticket = self.limit_order(symbol, quantity, limit_price)
+
         # Schedule exit
         self._pending_exits[symbol] = ipo_data.exit_target_date
 
@@ -202,9 +248,9 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
             f"Limit: ${limit_price:.2f} | Hold until: {ipo_data.exit_target_date.date()}"
         )
 
-        # Set tags for tracking
-        self.plot("IPO Positions", "Active Positions", len(self._ipo_positions))
-        self.plot("IPO Scores", symbol.value, ipo_data.score)
+        # Set tags for tracking (plotted by _flush_plots)
+        self._plot_dirty = True
+        self._pending_score_plots.append((symbol.value, ipo_data.score))
 
     def _manage_positions(self):
         """
@@ -213,7 +259,12 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
         2. Check stop losses
         3. Check time-based exits
         """
-        for symbol, ipo_data in list(self._ipo_positions.items()):
+        # Collect exits first and act on them after the loop, since a full
+        # exit removes the symbol from self._ipo_positions
+        to_trim = []   # (symbol, fraction, reason)
+        to_close = []  # (symbol, reason)
+
+        for symbol, ipo_data in self._ipo_positions.items():
             # Skip if not invested
             if not self.portfolio[symbol].invested:
                 continue
@@ -223,17 +274,17 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
 
             # Check profit target (close 50% of position)
             if current_return >= self._profit_target:
-                self._partial_exit(symbol, 0.5, f"Profit target {self._profit_target:.0%} hit")
+                to_trim.append((symbol, 0.5, f"Profit target {self._profit_target:.0%} hit"))
                 continue
 
             # Check stop loss
             if current_return <= self._stop_loss:
-                self._full_exit(symbol, f"Stop loss {self._stop_loss:.0%} hit")
+                to_close.append((symbol, f"Stop loss {self._stop_loss:.0%} hit"))
                 continue
 
             # Check time-based exit
             if self.time >= ipo_data.exit_target_date:
-                self._full_exit(symbol, f"Holding period {self._holding_period_days} days reached")
+                to_close.append((symbol, f"Holding period {self._holding_period_days} days reached"))
                 continue
 
             # Log current status
@@ -243,6 +294,12 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
                 f"Return: {current_return:.1%} | Target: {ipo_data.exit_target_date.date()}"
             )
 
+        for symbol, fraction, reason in to_trim:
+            self._partial_exit(symbol, fraction, reason)
+
+        for symbol, reason in to_close:
+            self._full_exit(symbol, reason)
+
     def _partial_exit(self, symbol, fraction, reason):
         """
         Exit a partial position.
@@ -297,14 +354,33 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
         if symbol in self._pending_exits:
             del self._pending_exits[symbol]
 
+        self._plot_dirty = True
+
+    def _flush_plots(self):
+        """Plot the day's position count and entry scores in one pass."""
+        if not self._plot_dirty:
+            return
+
         self.plot("IPO Positions", "Active Positions", len(self._ipo_positions))
+        for ticker, score in self._pending_score_plots:
+            self.plot("IPO Scores", ticker, score)
+
+        self._pending_score_plots.clear()
+        self._plot_dirty = False
 
     def _get_vix_level(self):
-        """Get current VIX level for risk adjustment."""
-        vix_history = self.history(self._vix, 1, Resolution.DAILY)
-        if vix_history.empty:
-            return 15  # Default
-        return vix_history['close'].iloc[-1]
+        """Get current VIX level for risk adjustment (one history call per day)."""
+        today = self.time.date()
+        vix_level = self._vix_cache.get(today)
+        if vix_level is None:
+            vix_history = self.history(self._vix, 1, Resolution.DAILY)
+            vix_level = vix_history['close'].iloc[-1] if not vix_history.empty else 15  # Default
+            self._vix_cache[today] = vix_level
+
+            # Drop the oldest days so the cache stays small over multi-year runs
+            while len(self._vix_cache) > 5:
+                del self._vix_cache[next(iter(self._vix_cache))]
+        return vix_level
 
     def on_data(self, data):
         """
@@ -316,6 +392,11 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
 
     def on_order_event(self, order_event):
         """Track order fills."""
+        if order_event.status not in (OrderStatus.FILLED, OrderStatus.PARTIALLY_FILLED):
+            return
+
+        self._update_ipo_cost(order_event)
+
         if order_event.status != OrderStatus.FILLED:
             return
 
@@ -328,6 +409,34 @@ class IPOPreAnalysisDayOneAlgorithm(QCAlgorithm):
             f"Direction: {order.direction}"
         )
 
+    def _update_ipo_cost(self, order_event):
+        """
+        Track IPO exposure incrementally from fills instead of sweeping the
+        portfolio: buys add their fill cost, sells release the sold share.
+        """
+        symbol = order_event.symbol
+        fill_quantity = order_event.fill_quantity
+
+        if fill_quantity > 0:
+            if symbol not in self._ipo_positions:
+                return
+            cost = fill_quantity * order_event.fill_price
+            self._ipo_cost_basis[symbol] = self._ipo_cost_basis.get(symbol, 0.0) + cost
+            self._ipo_cost_total += cost
+            return
+
+        if symbol not in self._ipo_cost_basis:
+            return
+
+        # Holdings already include this fill
+        remaining = self.portfolio[symbol].quantity
+        if remaining <= 0:
+            released_cost = self._ipo_cost_basis.pop(symbol)
+        else:
+            released_cost = self._ipo_cost_basis[symbol] * -fill_quantity / (remaining - fill_quantity)
+            self._ipo_cost_basis[symbol] -= released_cost
+        self._ipo_cost_total -= released_cost
+
     def on_end_of_algorithm(self):
         """Final statistics at end of backtest."""
         self.log("=" * 50)
@@ -13,49 +13,95 @@ This script helps collect and consolidate IPO calendar data from multiple source
 """
 
 import argparse
+import functools
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 import sys
-
+from pathlib import Path
+from typing import NamedTuple
+
+# Browser-like headers for scraping public IPO pages
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Curated major IPOs, shipped as a typed parquet file next to the calendar data
+MAJOR_IPOS_PATH = Path(__file__).resolve().parent.parent / 'data' / 'major_ipos.parquet'
+
+class IPO(NamedTuple):
+    """One row of the curated IPO table."""
+    ticker: str
+    company: str
+    ipo_date: str
+    offer_price: float
+    sector: str
+
+# Source rows for data/major_ipos.parquet (regenerate with --rebuild-defaults)
+_MAJOR_IPOS = (
+    # 2023
+    IPO('ARM', 'Arm Holdings', '2023-09-14', 51.00, 'Technology'),
+    IPO('BIRK', 'Birkenstock Holding', '2023-10-11', 46.00, 'Consumer'),
+    IPO('KVUE', 'Kenvue Inc', '2023-05-04', 22.00, 'Healthcare'),
+    IPO('CART', 'Maplebear Inc (Instacart)', '2023-09-19', 30.00, 'Technology'),
+    IPO('KLR', 'Klaviyo Inc', '2023-09-20', 30.00, 'Technology'),
+    IPO('FRSH', 'Freshworks Inc', '2023-09-22', 36.00, 'Technology'),
+    IPO('NXT', 'Nextracker Inc', '2023-02-09', 24.00, 'Energy'),
+    IPO('PACS', 'PACS Group', '2023-06-16', 19.00, 'Industrial'),
+    IPO('BRW', 'Saba Capital Income', '2023-03-29', 20.00, 'Financial'),
+    IPO('CLBT', 'Cellebrite DI', '2023-08-31', 7.00, 'Technology'),
+
+    # 2024
+    IPO('RDDT', 'Reddit Inc', '2024-03-21', 34.00, 'Technology'),
+    IPO('AZPN', 'Aspen Aerogels', '2024-01-18', 13.00, 'Materials'),
+    IPO('BN', 'Brookfield Corporation', '2024-02-15', 32.00, 'Financial'),
+    IPO('AEYE', 'AudioEye Inc', '2024-03-14', 11.00, 'Technology'),
+    IPO('TOST', 'Toast Inc', '2024-04-22', 40.00, 'Technology'),
+    IPO('CNXC', 'Concentrix Corporation', '2024-05-30', 28.00, 'Technology'),
+    IPO('SPCE', 'Virgin Galactic', '2024-06-11', 10.00, 'Aerospace'),
+    IPO('WBD', 'Warner Bros Discovery', '2024-07-18', 15.00, 'Media'),
+    IPO('CELH', 'Celsius Holdings', '2024-08-22', 25.00, 'Consumer'),
+    IPO('ELF', 'e.l.f. Beauty', '2024-09-19', 18.00, 'Consumer'),
+)
+
+def _major_ipos_frame():
+    """Build the curated IPO table from _MAJOR_IPOS with compact dtypes."""
+    df = pd.DataFrame.from_records(_MAJOR_IPOS, columns=IPO._fields)
+    return df.astype({
+        'ticker': 'category',
+        'sector': 'category',
+        'ipo_date': 'datetime64[ns]',
+        'offer_price': 'float32',
+    })
+
+def write_major_ipos_asset(path=MAJOR_IPOS_PATH):
+    """Write the curated IPO table to its parquet asset."""
+    _major_ipos_frame().to_parquet(path, index=False)
+    return path
+
+@functools.lru_cache(maxsize=1)
 def get_major_ipos_2023_2024():
     """
     Returns a curated list of major IPOs from 2023-2024.
 
+    The table is read once from data/major_ipos.parquet (columnar and
+    already typed) and cached, so treat the returned DataFrame as
+    read-only. If the file or a parquet engine is unavailable it is
+    built from _MAJOR_IPOS instead.
+
     This is a starting point. You should supplement with:
     - Renaissance Capital IPO database
     - Your own research
     - IPO news sources
     """
-    ipos = [
-        # 2023
-        {'ticker': 'ARM', 'company': 'Arm Holdings', 'ipo_date': '2023-09-14', 'offer_price': 51.00, 'sector': 'Technology'},
-        {'ticker': 'BIRK', 'company': 'Birkenstock Holding', 'ipo_date': '2023-10-11', 'offer_price': 46.00, 'sector': 'Consumer'},
-        {'ticker': 'KVUE', 'company': 'Kenvue Inc', 'ipo_date': '2023-05-04', 'offer_price': 22.00, 'sector': 'Healthcare'},
-        {'ticker': 'CART', 'company': 'Maplebear Inc (Instacart)', 'ipo_date': '2023-09-19', 'offer_price': 30.00, 'sector': 'Technology'},
-        {'ticker': 'KLR', 'company': 'Klaviyo Inc', 'ipo_date': '2023-09-20', 'offer_price': 30.00, 'sector': 'Technology'},
-        {'ticker': 'FRSH', 'company': 'Freshworks Inc', 'ipo_date': '2023-09-22', 'offer_price': 36.00, 'sector': 'Technology'},
-        {'ticker': 'NXT', 'company': 'Nextracker Inc', 'ipo_date': '2023-02-09', 'offer_price': 24.00, 'sector': 'Energy'},
-        {'ticker': 'PACS', 'company': 'PACS Group', 'ipo_date': '2023-06-16', 'offer_price': 19.00, 'sector': 'Industrial'},
-        {'ticker': 'BRW', 'company': 'Saba Capital Income', 'ipo_date': '2023-03-29', 'offer_price': 20.00, 'sector': 'Financial'},
-        {'ticker': 'CLBT', 'company': 'Cellebrite DI', 'ipo_date': '2023-08-31', 'offer_price': 7.00, 'sector': 'Technology'},
-
-        # 2024
-        {'ticker': 'RDDT', 'company': 'Reddit Inc', 'ipo_date': '2024-03-21', 'offer_price': 34.00, 'sector': 'Technology'},
-        {'ticker': 'AZPN', 'company': 'Aspen Aerogels', 'ipo_date': '2024-01-18', 'offer_price': 13.00, 'sector': 'Materials'},
-        {'ticker': 'BN', 'company': 'Brookfield Corporation', 'ipo_date': '2024-02-15', 'offer_price': 32.00, 'sector': 'Financial'},
-        {'ticker': 'AEYE', 'company': 'AudioEye Inc', 'ipo_date': '2024-03-14', 'offer_price': 11.00, 'sector': 'Technology'},
-        {'ticker': 'TOST', 'company': 'Toast Inc', 'ipo_date': '2024-04-22', 'offer_price': 40.00, 'sector': 'Technology'},
-        {'ticker': 'CNXC', 'company': 'Concentrix Corporation', 'ipo_date': '2024-05-30', 'offer_price': 28.00, 'sector': 'Technology'},
-        {'ticker': 'SPCE', 'company': 'Virgin Galactic', 'ipo_date': '2024-06-11', 'offer_price': 10.00, 'sector': 'Aerospace'},
-        {'ticker': 'WBD', 'company': 'Warner Bros Discovery', 'ipo_date': '2024-07-18', 'offer_price': 15.00, 'sector': 'Media'},
-        {'ticker': 'CELH', 'company': 'Celsius Holdings', 'ipo_date': '2024-08-22', 'offer_price': 25.00, 'sector': 'Consumer'},
-        {'ticker': 'ELF', 'company': 'e.l.f. Beauty', 'ipo_date': '2024-09-19', 'offer_price': 18.00, 'sector': 'Consumer'},
-    ]
-
-    return pd.DataFrame(ipos)
+    try:
+        return pd.read_parquet(MAJOR_IPOS_PATH)
+    except (OSError, ImportError) as e:
+        print(f"Could not read {MAJOR_IPOS_PATH} ({e}); using built-in list")
+        return _major_ipos_frame()
 
 def scrape_renaissance_capital(year=2024):
     """
@@ -66,16 +112,12 @@ def scrape_renaissance_capital(year=2024):
     """
     url = f"https://www.renaissancecapital.com/IPO-Center/IPO-Performance?year={year}"
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
     try:
         print(f"Fetching data from Renaissance Capital for {year}...")
-        response = requests.get(url, headers=headers, timeout=15)
+        response = requests.get(url, headers=HEADERS, timeout=15)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
 
         # Find the IPO table (you'll need to inspect the page)
         # This is a placeholder - actual implementation depends on site structure
@@ -140,11 +182,16 @@ def merge_sources(dfs):
     # Concatenate all dataframes
     df_combined = pd.concat(dfs, ignore_index=True)
 
+    # Categorical codes are smaller and faster to hash than object strings
+    for col in ('ticker', 'sector'):
+        if col in df_combined.columns:
+            df_combined[col] = df_combined[col].astype('category')
+
     # Remove duplicates (keep first occurrence)
-    df_combined = df_combined.drop_duplicates(subset=['ticker'], keep='first')
+    df_combined = df_combined.drop_duplicates(subset=['ticker'], keep='first', ignore_index=True)
 
-    # Sort by IPO date
-    df_combined = df_combined.sort_values('ipo_date', ascending=False)
+    # Sort by IPO date (stable, so same-day IPOs keep source order)
+    df_combined = df_combined.sort_values('ipo_date', ascending=False, kind='stable')
 
     return df_combined
 
@@ -154,9 +201,14 @@ def main():
     parser.add_argument('--manual', type=str, help='Path to manual CSV file')
     parser.add_argument('--output', type=str, default='data/ipo_calendar.csv', help='Output CSV file')
     parser.add_argument('--include-defaults', action='store_true', help='Include default major IPOs list')
+    parser.add_argument('--rebuild-defaults', action='store_true', help='Rewrite data/major_ipos.parquet from the built-in list and exit')
 
     args = parser.parse_args()
 
+    if args.rebuild_defaults:
+        print(f"Wrote {write_major_ipos_asset()}")
+        return
+
     print("="*60)
     print("IPO Calendar Collection Tool")
     print("="*60)
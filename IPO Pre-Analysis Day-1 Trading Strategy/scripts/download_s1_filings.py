@@ -4,193 +4,489 @@ SEC EDGAR S-1 Filing Downloader
 Usage:
     python download_s1_filings.py --input data/ipo_calendar.csv --output data/s1_filings/
 
-Downloads S-1 filings from SEC EDGAR for a list of tickers.
+Downloads S-1 filings from SEC EDGAR for a list of tickers and saves them as
+gzip-compressed TICKER_s1.html.gz files (plain TICKER_s1.html with
+--no-compress). Tickers are processed concurrently by a small pool of worker
+threads (--workers). All requests share one token-bucket rate limiter
+(--max-rate, default 9 per second) to stay under SEC's 10 requests/second.
 
 Requirements:
     - requests
-    - beautifulsoup4
+    - lxml
     - pandas
+    - requests-cache (optional; caches EDGAR responses between runs)
 
 Important: SEC requires you to identify yourself in the User-Agent header.
 Update the email address before running.
 """
 
 import argparse
+import csv
+import functools
+import gzip
+import json
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+import lxml.html
 import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
 # IMPORTANT: Replace with your information
 USER_AGENT = "YourCompany your.email@example.com"
 
-def get_cik_from_ticker(ticker):
+# Sent with every request. EDGAR compresses HTML and JSON responses when
+# asked, which makes index pages and submissions files several times smaller.
+HEADERS = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'}
+
+# Persistent HTTP cache (used when requests-cache is installed). Filing
+# index pages never change, so they are kept indefinitely; search and
+# submissions responses are refreshed daily. The S-1 documents themselves
+# are not cached: they are already saved to --output, and caching would
+# buffer each multi-MB filing in memory instead of streaming it to disk.
+HTTP_CACHE_PATH = Path.home() / '.cache' / 'edgar_cache'
+HTTP_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# One keep-alive session shared by all requests (and worker threads), so
+# repeated calls to www.sec.gov reuse connections instead of opening a new
+# TCP+TLS connection per request.
+if requests_cache is not None:
+    SESSION = requests_cache.CachedSession(
+        HTTP_CACHE_PATH,
+        expire_after=HTTP_CACHE_TTL,
+        urls_expire_after={
+            'www.sec.gov/Archives/edgar/data/*-index.htm': requests_cache.NEVER_EXPIRE,
+            'www.sec.gov/Archives/': requests_cache.DO_NOT_CACHE,
+        },
+    )
+else:
+    SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+class RateLimiter:
     """
-    Get CIK (Central Index Key) number from ticker symbol.
+    Thread-safe token bucket: allows bursts of up to `max_rate` requests (at
+    least one) and refills at `max_rate` requests per `time_period` seconds.
 
-    SEC uses CIK instead of tickers internally.
+    Unlike a fixed sleep after every request, callers only wait when the
+    budget is actually used up, so fast responses don't waste time.
     """
-    url = f"https://www.sec.gov/cgi-bin/browse-edgar?company={ticker}&action=getcompany"
 
-    headers = {'User-Agent': USER_AGENT}
+    def __init__(self, max_rate, time_period=1.0):
+        # A bucket smaller than one token could never release a request
+        self._capacity = max(1, max_rate)
+        self._fill_rate = max_rate / time_period
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._fill_rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self._fill_rate
+
+            time.sleep(wait)
+
+# Shared by all worker threads; main() resizes it from --max-rate
+RATE_LIMITER = RateLimiter(max_rate=9, time_period=1)
+
+def sec_get(url, **kwargs):
+    """GET through the shared session, within the SEC request-rate budget."""
+    # Cache hits never reach SEC, so they don't spend rate-limit tokens
+    if requests_cache is not None:
+        response = SESSION.get(url, only_if_cached=True, **kwargs)
+        if response.status_code != 504:
+            return response
+
+    RATE_LIMITER.acquire()
+    return SESSION.get(url, **kwargs)
+
+# SEC publishes the full ticker -> CIK mapping as one JSON file. It is cached
+# on disk for a day so re-runs don't download it again.
+CIK_MAP_URL = "https://www.sec.gov/files/company_tickers.json"
+CIK_MAP_CACHE = Path.home() / '.cache' / 'sec_cik_map.json'
+CIK_MAP_TTL = 24 * 60 * 60  # seconds
+
+_cik_map = None
+_cik_map_lock = threading.Lock()
+
+def load_cik_map():
+    """
+    Load the ticker -> CIK mapping, from the disk cache if it is fresh.
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        time.sleep(0.1)  # Rate limiting
+    If the download fails, a stale disk cache is used instead. With no
+    cache to fall back on the error is raised, and nothing is remembered,
+    so the next call tries the download again.
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+    Returns:
+        Dict of upper-case ticker to 10-digit, zero-padded CIK string
+    """
+    global _cik_map
+
+    with _cik_map_lock:
+        if _cik_map is not None:
+            return _cik_map
+
+        # Use the cached copy if it is less than a day old
+        try:
+            if time.time() - CIK_MAP_CACHE.stat().st_mtime < CIK_MAP_TTL:
+                _cik_map = json.loads(CIK_MAP_CACHE.read_bytes())
+                return _cik_map
+        except (OSError, ValueError):
+            pass
+
+        try:
+            response = sec_get(CIK_MAP_URL, timeout=30)
+            response.raise_for_status()
+            # Parse the raw bytes; json detects UTF-8 itself, so requests never
+            # has to decode the body to text first
+            data = json.loads(response.content)
+        except Exception as e:
+            print(f"Error loading ticker-to-CIK map: {e}")
+            try:
+                _cik_map = json.loads(CIK_MAP_CACHE.read_bytes())
+            except (OSError, ValueError):
+                raise e
+            print("Using stale cached ticker-to-CIK map")
+            return _cik_map
+
+        _cik_map = {row['ticker'].upper(): str(row['cik_str']).zfill(10) for row in data.values()}
+
+        try:
+            CIK_MAP_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            with open(CIK_MAP_CACHE, 'w', encoding='utf-8') as f:
+                json.dump(_cik_map, f)
+        except OSError as e:
+            print(f"Could not cache ticker-to-CIK map: {e}")
+
+        return _cik_map
+
+@functools.lru_cache(maxsize=4096)
+def get_cik_from_ticker(ticker):
+    """
+    Get CIK (Central Index Key) number from ticker symbol.
 
-        # Look for CIK in page
-        cik_element = soup.find('span', {'class': 'companyName'})
+    SEC uses CIK instead of tickers internally.
+    """
+    return load_cik_map().get(ticker.upper())
 
-        if cik_element:
-            # Extract CIK from text like "COMPANY NAME CIK#: 0001234567"
-            text = cik_element.get_text()
-            if 'CIK' in text:
-                cik = text.split('CIK#:')[1].split()[0]
-                return cik.strip()
+S1_FORMS = ('S-1', 'S-1/A')
 
-        return None
+# Rows between flushes of _download_log.csv
+LOG_FLUSH_EVERY = 25
 
-    except Exception as e:
-        print(f"Error getting CIK for {ticker}: {e}")
-        return None
+EFTS_SEARCH_URL = "https://efts.sec.gov/LATEST/search-index"
+EFTS_CIKS_PER_QUERY = 50  # keeps the ciks= filter's query string short
 
 def find_s1_filing_url(ticker, cik=None):
     """
     Find the URL for the S-1 filing document.
 
+    Uses EDGAR's JSON submissions API, which lists a company's filings
+    with their primary documents in a single request. Falls back to the
+    HTML filing search when the S-1 is older than the filings in the
+    API's "recent" block.
+
     Returns the URL of the HTML document, not the cover page.
     """
-    # Get CIK if not provided
-    if not cik:
-        cik = get_cik_from_ticker(ticker)
+    try:
+        # Get CIK if not provided
         if not cik:
-            return None
+            cik = get_cik_from_ticker(ticker)
+            if not cik:
+                return None
 
-    # Search for S-1 filings
-    search_url = f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={cik}&type=S-1&dateb=&owner=exclude&count=10"
+        return _find_s1_filing_url_for_cik(cik.zfill(10))
 
-    headers = {'User-Agent': USER_AGENT}
+    except Exception as e:
+        print(f"Error finding S-1 for {ticker}: {e}")
+        return None
 
-    try:
-        response = requests.get(search_url, headers=headers, timeout=10)
-        time.sleep(0.2)
+@functools.lru_cache(maxsize=4096)
+def _find_s1_filing_url_for_cik(cik):
+    """
+    Look up the S-1 document URL for a 10-digit CIK.
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+    Memoized per CIK, so each company is resolved at most once per run.
+    Errors propagate instead of returning None, so a failed lookup is not
+    cached and can be retried.
+    """
+    submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
 
-        # Find the documents table
-        doc_table = soup.find('table', {'class': 'tableFile2'})
+    response = sec_get(submissions_url, timeout=10)
+    response.raise_for_status()
 
-        if not doc_table:
-            return None
+    # Parallel arrays, most recent filing first
+    recent = json.loads(response.content)['filings']['recent']
 
-        # Get first row (most recent S-1)
-        rows = doc_table.find_all('tr')[1:]  # Skip header
+    for form, accession, primary_doc in zip(
+            recent['form'], recent['accessionNumber'], recent['primaryDocument']):
+        if form in S1_FORMS and primary_doc:
+            return (f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/"
+                    f"{accession.replace('-', '')}/{primary_doc}")
 
-        if not rows:
-            return None
+    return _find_s1_filing_url_html(cik)
 
-        # Find documents link
-        first_row = rows[0]
-        docs_button = first_row.find('a', {'id': 'documentsbutton'})
+def discover_s1_urls(tickers, start_date, end_date):
+    """
+    Find S-1 document URLs for many tickers with EDGAR full-text search.
 
-        if not docs_button:
-            return None
+    Searches S-1 / S-1/A documents filed between start_date and end_date by
+    the batch's companies only (a few dozen CIKs per query, 100 hits per
+    request) instead of looking each ticker up separately, keeping the most
+    recent S-1 per company.
 
-        # Go to documents page
-        docs_url = 'https://www.sec.gov' + docs_button['href']
+    Args:
+        tickers: Tickers to look for
+        start_date, end_date: Filing date range as YYYY-MM-DD strings
 
-        # Get document list
-        response = requests.get(docs_url, headers=headers, timeout=10)
-        time.sleep(0.2)
+    Returns:
+        Dict of ticker -> S-1 document URL for the tickers that were found
+    """
+    # Without the CIK map, leave every ticker to the per-ticker lookup
+    try:
+        ciks = {}
+        for ticker in tickers:
+            cik = get_cik_from_ticker(ticker)
+            if cik:
+                ciks[cik] = ticker
+    except Exception:
+        return {}
+
+    latest = {}  # ticker -> (file_date, url)
+    page_size = 100
+    cik_list = list(ciks)
+
+    for i in range(0, len(cik_list), EFTS_CIKS_PER_QUERY):
+        offset = 0
+
+        while True:
+            params = {
+                'forms': ','.join(S1_FORMS),
+                'ciks': ','.join(cik_list[i:i + EFTS_CIKS_PER_QUERY]),
+                'dateRange': 'custom',
+                'startdt': start_date,
+                'enddt': end_date,
+                'from': offset,
+            }
+
+            try:
+                response = sec_get(EFTS_SEARCH_URL, params=params, timeout=30)
+                response.raise_for_status()
+                hits = json.loads(response.content)['hits']
+            except Exception as e:
+                print(f"Error searching EDGAR full-text search: {e}")
+                break
+
+            for hit in hits['hits']:
+                source = hit['_source']
+
+                # Each filing has one hit per document; keep the main S-1 only
+                if source.get('file_type') not in S1_FORMS:
+                    continue
+
+                for cik in source.get('ciks', []):
+                    ticker = ciks.get(cik.zfill(10))
+                    if not ticker:
+                        continue
+
+                    file_date = source.get('file_date', '')
+                    if ticker in latest and latest[ticker][0] >= file_date:
+                        continue
+
+                    filename = hit['_id'].split(':', 1)[1]
+                    accession = source['adsh'].replace('-', '')
+                    latest[ticker] = (
+                        file_date,
+                        f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession}/{filename}"
+                    )
+
+            offset += page_size
+            # Full-text search returns at most 10,000 hits per query
+            if offset >= min(hits['total']['value'], 10_000) or not hits['hits']:
+                break
+
+    return {ticker: url for ticker, (_, url) in latest.items()}
+
+def _find_s1_filing_url_html(cik):
+    """
+    Find the S-1 document URL by walking EDGAR's HTML filing search.
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+    Slower than the submissions API (two pages to fetch and parse), but
+    it searches the company's whole filing history.
+    """
+    # Search for S-1 filings
+    search_url = f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={cik}&type=S-1&dateb=&owner=exclude&count=10"
 
-        # Find main S-1 document (usually first .htm file)
-        doc_table = soup.find('table', {'class': 'tableFile'})
+    response = sec_get(search_url, timeout=10)
 
-        if not doc_table:
-            return None
+    # Documents links in the filings table; the first is the most recent S-1
+    tree = lxml.html.fromstring(response.content)
+    docs_hrefs = tree.xpath("//table[@class='tableFile2']//tr/td/a[@id='documentsbutton']/@href")
 
-        for row in doc_table.find_all('tr')[1:]:
-            cols = row.find_all('td')
+    if not docs_hrefs:
+        return None
 
-            if len(cols) >= 3:
-                doc_type = cols[3].get_text().strip()
+    # Go to documents page
+    docs_url = 'https://www.sec.gov' + docs_hrefs[0]
 
-                # Look for main S-1 document
-                if 'S-1' in doc_type or 'S-1/A' in doc_type:
-                    doc_link = cols[2].find('a')
+    # Get document list
+    response = sec_get(docs_url, timeout=10)
 
-                    if doc_link:
-                        return 'https://www.sec.gov' + doc_link['href']
+    # Main S-1 document: first row whose Type column (4th) mentions S-1
+    tree = lxml.html.fromstring(response.content)
+    doc_hrefs = tree.xpath("//table[@class='tableFile']//tr[td[4][contains(text(), 'S-1')]]/td[3]/a/@href")
 
+    if not doc_hrefs:
         return None
 
-    except Exception as e:
-        print(f"Error finding S-1 for {ticker}: {e}")
-        return None
+    return 'https://www.sec.gov' + doc_hrefs[0]
 
-def download_s1_filing(ticker, output_dir, cik=None):
+def download_s1_filing(ticker, output_dir, cik=None, url=None, compress=True):
     """
     Download S-1 filing and save as HTML file.
 
+    Args:
+        url: S-1 document URL if already known (e.g. from discover_s1_urls);
+            looked up per ticker otherwise
+        compress: Write gzip-compressed TICKER_s1.html.gz (S-1 HTML
+            compresses about 10x) instead of plain TICKER_s1.html
+
     Returns:
         Path to downloaded file or None if failed
     """
     # Find S-1 URL
-    url = find_s1_filing_url(ticker, cik)
+    if not url:
+        url = find_s1_filing_url(ticker, cik)
 
     if not url:
         return None
 
-    headers = {'User-Agent': USER_AGENT}
+    filepath = os.path.join(output_dir, f"{ticker}_s1.html" + ('.gz' if compress else ''))
+    partial_path = filepath + '.part'
 
     try:
-        # Download file
-        response = requests.get(url, headers=headers, timeout=30)
-        time.sleep(0.3)  # Be polite
+        # Stream the raw bytes straight to disk in 64 KB chunks, so memory
+        # stays flat however large the filing is
+        with sec_get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
 
-        # Save to file
-        filepath = os.path.join(output_dir, f"{ticker}_s1.html")
+            if compress:
+                f = gzip.open(partial_path, 'wb', compresslevel=6)
+            else:
+                f = open(partial_path, 'wb')
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(response.text)
+            with f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
+
+        # Only a complete download gets the final name (see skip-existing check)
+        os.replace(partial_path, filepath)
 
         return filepath
 
     except Exception as e:
         print(f"Error downloading {ticker}: {e}")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
         return None
 
+def list_downloaded_tickers(output_dir):
+    """
+    Find the tickers that already have an S-1 file in output_dir.
+
+    Returns:
+        Dict of ticker -> path of its TICKER_s1.html or TICKER_s1.html.gz
+    """
+    downloaded = {}
+    with os.scandir(output_dir) as entries:
+        for e in entries:
+            for suffix in ('_s1.html', '_s1.html.gz'):
+                if e.name.endswith(suffix):
+                    downloaded[e.name[:-len(suffix)]] = e.path
+    return downloaded
+
+def process_ticker(ticker, output_dir, already_downloaded, s1_urls, compress):
+    """
+    Download the S-1 for one ticker unless it is already on disk.
+
+    Returns:
+        (result dict for the download log, status message)
+    """
+    # Check if already downloaded
+    if ticker in already_downloaded:
+        existing = already_downloaded[ticker]
+        return {'ticker': ticker, 'success': True, 'path': existing}, "✓ Already exists (skipping)"
+
+    # Download
+    filepath = download_s1_filing(ticker, output_dir, url=s1_urls.get(ticker), compress=compress)
+
+    if filepath:
+        return {'ticker': ticker, 'success': True, 'path': filepath}, "✓ Downloaded"
+    return {'ticker': ticker, 'success': False, 'path': None}, "✗ Failed"
+
 def main():
     parser = argparse.ArgumentParser(description='Download S-1 filings from SEC EDGAR')
     parser.add_argument('--input', type=str, required=True, help='Input CSV with ticker column')
     parser.add_argument('--output', type=str, default='data/s1_filings/', help='Output directory')
     parser.add_argument('--limit', type=int, help='Limit number to download (for testing)')
-    parser.add_argument('--delay', type=float, default=1.0, help='Delay between requests (seconds)')
+    parser.add_argument('--max-rate', type=float, default=9, help='Max SEC requests per second across all workers')
+    parser.add_argument('--workers', type=int, default=4, help='Number of tickers to download concurrently')
+    parser.add_argument('--no-compress', action='store_true', help='Save plain .html instead of gzipped .html.gz')
 
     args = parser.parse_args()
 
+    if args.max_rate <= 0:
+        parser.error("--max-rate must be positive")
+
+    global RATE_LIMITER
+    RATE_LIMITER = RateLimiter(max_rate=args.max_rate, time_period=1)
+
     # Check User-Agent
     if "your.email@example.com" in USER_AGENT:
         print("ERROR: Please update USER_AGENT with your email address!")
         print("SEC requires identification in User-Agent header.")
-        print("Edit line 24 of this script.")
+        print("Edit USER_AGENT at the top of this script.")
         return
 
     # Load IPO list
     print(f"Loading IPO list from {args.input}...")
-    df = pd.read_csv(args.input)
+    # Only parse the columns this script uses
+    df = pd.read_csv(
+        args.input,
+        usecols=lambda col: col in ('ticker', 'ipo_date'),
+        dtype={'ticker': 'string'}
+    )
 
     if 'ticker' not in df.columns:
         print("ERROR: Input CSV must have 'ticker' column")
         return
 
-    tickers = df['ticker'].tolist()
+    # Drop blank/malformed tickers and duplicates before any network calls
+    ticker_col = df['ticker'].str.strip().str.upper()
+    valid = ticker_col.str.match(r'^[A-Z][A-Z0-9.\-]{0,5}$', na=False)
+    tickers = ticker_col[valid].unique().tolist()
+
+    invalid_count = int((~valid).sum())
+    if invalid_count:
+        print(f"Skipping {invalid_count} rows with a missing or invalid ticker")
 
     if args.limit:
         tickers = tickers[:args.limit]
@@ -201,58 +497,83 @@ def main():
     # Create output directory
     os.makedirs(args.output, exist_ok=True)
 
+    # One directory read instead of a stat per ticker
+    already_downloaded = list_downloaded_tickers(args.output)
+
+    # Find S-1 URLs for the whole batch with a few full-text search requests.
+    # S-1s are filed before the IPO, so search from a year before the first
+    # IPO date of the tickers being downloaded. Tickers not found here are
+    # looked up individually.
+    s1_urls = {}
+    to_download = [t for t in tickers if t not in already_downloaded]
+    if to_download and 'ipo_date' in df.columns:
+        batch_rows = valid & ticker_col.isin(to_download)
+        ipo_dates = pd.to_datetime(df.loc[batch_rows, 'ipo_date'], errors='coerce').dropna()
+        if not ipo_dates.empty:
+            start_date = (ipo_dates.min() - pd.Timedelta(days=365)).strftime('%Y-%m-%d')
+            end_date = ipo_dates.max().strftime('%Y-%m-%d')
+            print(f"Searching EDGAR for S-1 filings from {start_date} to {end_date}...")
+            s1_urls = discover_s1_urls(to_download, start_date, end_date)
+            print(f"Found {len(s1_urls)}/{len(to_download)} S-1 URLs by search")
+            print()
+
     # Download each filing
-    results = []
+    results_file = os.path.join(args.output, '_download_log.csv')
+    processed = 0
+    failed = []
+    interrupted = False
 
     print("="*60)
     print("Starting downloads...")
     print("="*60)
     print()
 
-    for i, ticker in enumerate(tickers, 1):
-        print(f"[{i}/{len(tickers)}] {ticker:6s} ... ", end='', flush=True)
-
-        # Check if already downloaded
-        existing = os.path.join(args.output, f"{ticker}_s1.html")
-        if os.path.exists(existing):
-            print("✓ Already exists (skipping)")
-            results.append({'ticker': ticker, 'success': True, 'path': existing})
-            continue
-
-        # Download
-        filepath = download_s1_filing(ticker, args.output)
-
-        if filepath:
-            print(f"✓ Downloaded")
-            results.append({'ticker': ticker, 'success': True, 'path': filepath})
-        else:
-            print(f"✗ Failed")
-            results.append({'ticker': ticker, 'success': False, 'path': None})
-
-        # Rate limiting
-        time.sleep(args.delay)
+    # Downloads are network-bound, so overlap several tickers at once.
+    # Results are reported in input order and written to the log as they
+    # arrive, so an interrupted run still leaves a log of what finished.
+    with open(results_file, 'w', newline='', encoding='utf-8') as log_file, \
+            ThreadPoolExecutor(max_workers=args.workers) as executor:
+        writer = csv.DictWriter(log_file, fieldnames=['ticker', 'success', 'path'])
+        writer.writeheader()
+
+        outcomes = executor.map(lambda t: process_ticker(
+            t, args.output, already_downloaded, s1_urls, not args.no_compress), tickers)
+
+        try:
+            for i, (ticker, (result, status)) in enumerate(zip(tickers, outcomes), 1):
+                print(f"[{i}/{len(tickers)}] {ticker:6s} ... {status}")
+
+                writer.writerow(result)
+                if i % LOG_FLUSH_EVERY == 0:
+                    log_file.flush()
+
+                processed += 1
+                if not result['success']:
+                    failed.append(ticker)
+        except KeyboardInterrupt:
+            # map() queued every ticker up front; drop the ones not started
+            # so only the in-flight downloads are waited for
+            interrupted = True
+            print()
+            print("Interrupted, waiting for in-progress downloads...")
+            executor.shutdown(wait=False, cancel_futures=True)
 
     # Summary
-    df_results = pd.DataFrame(results)
-    success_rate = df_results['success'].mean()
+    succeeded = processed - len(failed)
+    success_rate = succeeded / processed if processed else 0.0
 
     print()
     print("="*60)
-    print("Download Complete!")
+    print("Download Interrupted!" if interrupted else "Download Complete!")
     print("="*60)
     print(f"Success rate: {success_rate:.1%}")
-    print(f"Downloaded: {df_results['success'].sum()}/{len(df_results)}")
-    print(f"Failed: {(~df_results['success']).sum()}/{len(df_results)}")
+    print(f"Downloaded: {succeeded}/{processed}")
+    print(f"Failed: {len(failed)}/{processed}")
     print()
     print(f"Files saved to: {args.output}")
-
-    # Save results log
-    results_file = os.path.join(args.output, '_download_log.csv')
-    df_results.to_csv(results_file, index=False)
     print(f"Download log: {results_file}")
 
     # Show failed tickers
-    failed = df_results[~df_results['success']]['ticker'].tolist()
     if failed:
         print()
         print("Failed tickers (check manually):")